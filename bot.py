@@ -1,8 +1,11 @@
+import io
 import os
 import tempfile
 import sys
 import json
 import atexit
+import asyncio
+import functools
 from typing import Optional, Tuple, Set
 
 import aiosqlite
@@ -23,7 +26,6 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Railway: set DATA_DIR=/app/data and mount a Volume there
 DATA_DIR = os.getenv("DATA_DIR", os.path.join(BASE_DIR, "data"))
-STOCK_DIR = os.path.join(DATA_DIR, "stock")
 DB_PATH = os.path.join(DATA_DIR, "bot.db")
 
 # -------------------------
@@ -55,11 +57,11 @@ def parse_owner_ids(raw: str) -> Set[int]:
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN", "")
 
 # Supports either OWNER_IDS="1,2,3" or OWNER_ID="1"
-OWNER_IDS: Set[int] = set()
-OWNER_IDS |= parse_owner_ids(os.getenv("OWNER_IDS", ""))
+# Kept frozen; "mutation" (e.g. adding the app owner) rebinds the global.
+OWNER_IDS: frozenset = frozenset(parse_owner_ids(os.getenv("OWNER_IDS", "")))
 single_owner = os.getenv("OWNER_ID", "").strip()
 if single_owner.isdigit():
-    OWNER_IDS.add(int(single_owner))
+    OWNER_IDS |= {int(single_owner)}
 
 # Optional: also allow admins in a guild to use owner commands
 ALLOW_GUILD_ADMINS = os.getenv("ALLOW_GUILD_ADMINS", "false").lower() in ("1", "true", "yes", "y")
@@ -95,9 +97,10 @@ async def ensure_app_owner_in_owner_ids():
     Adds the Discord Application Owner to OWNER_IDS automatically.
     This makes OWNER_IDS work even if you didn't set it.
     """
+    global OWNER_IDS
     try:
         app = await bot.application_info()
-        OWNER_IDS.add(app.owner.id)
+        OWNER_IDS |= {app.owner.id}
         print(f"[OWNER] App owner added: {app.owner} ({app.owner.id})")
     except Exception as e:
         print(f"[OWNER] Could not fetch application owner: {type(e).__name__}: {e}")
@@ -107,7 +110,13 @@ async def ensure_app_owner_in_owner_ids():
 # -------------------------
 intents = discord.Intents.default()
 intents.members = True  # Enable "Server Members Intent" in Dev Portal
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+class LicenseBot(commands.Bot):
+    async def close(self):
+        await close_db()
+        await super().close()
+
+bot = LicenseBot(command_prefix="!", intents=intents)
 
 # -------------------------
 # Single-instance lock (optional; disable on Railway)
@@ -141,12 +150,13 @@ atexit.register(release_lock)
 # -------------------------
 # Helpers
 # -------------------------
-def stock_file(program: str, duration: str) -> str:
-    return os.path.join(STOCK_DIR, f"{program}_{duration}.txt")
-
 def choiceify(values):
     return [app_commands.Choice(name=v, value=v) for v in values]
 
+# Built once; every @app_commands.choices decorator shares these.
+PROGRAM_CHOICES = choiceify(PROGRAMS)
+DURATION_CHOICES = choiceify(DURATIONS)
+
 def mask_key(k: str) -> str:
     k = (k or "").strip()
     if len(k) <= 8:
@@ -162,202 +172,195 @@ def shorten_error(msg: str, limit: int = 300) -> str:
 # -------------------------
 # DB init
 # -------------------------
+# One shared connection for the whole process: opening a connection per call
+# spawns a fresh worker thread and re-reads the schema every time.
+DB: Optional[aiosqlite.Connection] = None
+
+# aiosqlite serializes statements on its worker thread, but multi-statement
+# writes still need to be kept from interleaving with each other.
+DB_WRITE_LOCK = asyncio.Lock()
+
 async def init_db():
+    global DB
+    if DB is not None:
+        return
+
     os.makedirs(DATA_DIR, exist_ok=True)
-    os.makedirs(STOCK_DIR, exist_ok=True)
-
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS keys (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                program TEXT NOT NULL,
-                duration TEXT NOT NULL,
-                key TEXT NOT NULL UNIQUE,
-                used_by INTEGER,
-                used_for INTEGER,
-                used_at TEXT
-            )
-        """)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS resellers (
-                user_id INTEGER NOT NULL,
-                program TEXT NOT NULL,
-                PRIMARY KEY (user_id, program)
-            )
-        """)
-        await db.commit()
+
+    # cached_statements sizes sqlite3's per-connection prepared-statement
+    # cache; with one long-lived connection, every SQL literal in this file
+    # stays prepared after its first use.
+    DB = await aiosqlite.connect(DB_PATH, cached_statements=256)
+    # WAL avoids the double fsync of the rollback journal and lets readers
+    # run alongside the writer; the rest trades a little durability/RAM for
+    # commit latency, which is fine for regenerable key stock.
+    await DB.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-64000;
+        PRAGMA mmap_size=268435456;
+    """)
+    await DB.execute("""
+        CREATE TABLE IF NOT EXISTS keys (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            program TEXT NOT NULL,
+            duration TEXT NOT NULL,
+            key TEXT NOT NULL UNIQUE,
+            used_by INTEGER,
+            used_for INTEGER,
+            used_at TEXT
+        )
+    """)
+    # Partial index over just the unused rows: pop_key/get_stock_count hit
+    # this predicate constantly, and used keys never need to be indexed.
+    await DB.execute("""
+        CREATE INDEX IF NOT EXISTS idx_keys_avail
+        ON keys(program, duration) WHERE used_at IS NULL
+    """)
+    await DB.execute("""
+        CREATE TABLE IF NOT EXISTS resellers (
+            user_id INTEGER NOT NULL,
+            program TEXT NOT NULL,
+            PRIMARY KEY (user_id, program)
+        )
+    """)
+    await DB.commit()
+
+    async with DB.execute("SELECT user_id, program FROM resellers") as cur:
+        async for user_id, prog in cur:
+            RESELLERS.add((user_id, prog))
+
+async def close_db():
+    global DB
+    if DB is not None:
+        try:
+            await DB.close()
+        finally:
+            DB = None
 
 # -------------------------
 # Reseller helpers
 # -------------------------
+# In-process mirror of the resellers table (loaded in init_db, kept in sync
+# by add/remove below) so the hot permission checks never touch SQLite.
+RESELLERS: Set[Tuple[int, str]] = set()
+
 async def reseller_has_access(user_id: int, program: str) -> bool:
-    if is_owner(user_id):
-        return True
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            "SELECT 1 FROM resellers WHERE user_id = ? AND program = ?",
-            (user_id, program),
-        )
-        row = await cur.fetchone()
-        return row is not None
+    return user_id in OWNER_IDS or (user_id, program) in RESELLERS
 
 async def is_reseller_anywhere(user_id: int) -> bool:
-    if is_owner(user_id):
+    if user_id in OWNER_IDS:
         return True
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute("SELECT 1 FROM resellers WHERE user_id = ? LIMIT 1", (user_id,))
-        row = await cur.fetchone()
-        return row is not None
+    return any(uid == user_id for uid, _ in RESELLERS)
 
 async def add_reseller_db(user_id: int, program: str):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
+    async with DB_WRITE_LOCK:
+        await DB.execute(
             "INSERT OR IGNORE INTO resellers(user_id, program) VALUES(?, ?)",
             (user_id, program),
         )
-        await db.commit()
+        await DB.commit()
+    RESELLERS.add((user_id, program))
 
 async def remove_reseller_db(user_id: int, program: str):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
+    async with DB_WRITE_LOCK:
+        await DB.execute(
             "DELETE FROM resellers WHERE user_id = ? AND program = ?",
             (user_id, program),
         )
-        await db.commit()
+        await DB.commit()
+    RESELLERS.discard((user_id, program))
 
 # -------------------------
 # Stock helpers
 # -------------------------
-async def add_stock_via_text(program: str, duration: str, raw_text: str) -> Tuple[int, int]:
+# Maps every accepted separator (comma, semicolon, tab, space) to newline
+# in one pass instead of four full-copy replace calls.
+_SEP_TABLE = bytes.maketrans(b",;\t ", b"\n\n\n\n")
+
+def parse_keys(data: bytes) -> list:
     """
-    Inserts into DB first.
-    Only appends to TXT for keys that actually inserted.
+    Splits uploaded stock bytes into unique keys, first-seen order.
+    Works on the raw bytes so large uploads skip the full-buffer decode;
+    only the individual keys get decoded.
     Accepts separators: newline, comma, semicolon, tab, space
-    Returns (added, skipped_duplicates)
     """
-    path = stock_file(program, duration)
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-
-    normalized = (
-        raw_text.replace(",", "\n")
-        .replace(";", "\n")
-        .replace("\t", "\n")
-        .replace(" ", "\n")
-    )
-
-    seen = set()
-    keys = []
-    for line in normalized.splitlines():
-        k = line.strip()
-        if k and k not in seen:
-            seen.add(k)
-            keys.append(k)
+    lines = data.translate(_SEP_TABLE).splitlines()
+    # dict.fromkeys dedupes in one pass while keeping first-seen order.
+    return list(dict.fromkeys(
+        k for k in (line.strip().decode("utf-8", errors="ignore") for line in lines) if k
+    ))
 
+async def add_stock(program: str, duration: str, keys: list) -> Tuple[int, int]:
+    """
+    Inserts keys into the DB (the single source of truth).
+    Returns (added, skipped_duplicates)
+    """
     if not keys:
         return 0, 0
 
-    added_keys = []
-    skipped = 0
-
-    async with aiosqlite.connect(DB_PATH) as db:
-        for k in keys:
-            try:
-                await db.execute(
-                    "INSERT INTO keys(program, duration, key) VALUES(?, ?, ?)",
-                    (program, duration, k),
-                )
-                added_keys.append(k)
-            except aiosqlite.IntegrityError:
-                skipped += 1
-        await db.commit()
-
-    if added_keys:
-        with open(path, "a", encoding="utf-8") as f:
-            for k in added_keys:
-                f.write(k + "\n")
-
-    return len(added_keys), skipped
+    async with DB_WRITE_LOCK:
+        # total_changes counts which inserts actually landed
+        # (INSERT OR IGNORE swallows duplicates without an exception).
+        cur = await DB.execute("SELECT total_changes()")
+        (before,) = await cur.fetchone()
 
-async def get_stock_count(program: str, duration: str) -> int:
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            "SELECT COUNT(*) FROM keys WHERE program = ? AND duration = ? AND used_at IS NULL",
-            (program, duration),
+        await DB.executemany(
+            "INSERT OR IGNORE INTO keys(program, duration, key) VALUES(?, ?, ?)",
+            [(program, duration, k) for k in keys],
         )
-        (count,) = await cur.fetchone()
-        return int(count)
-
-def remove_key_from_txt(program: str, duration: str, key_value: str) -> bool:
-    """
-    Removes ONE occurrence of key_value from the txt file.
-    """
-    path = stock_file(program, duration)
-    if not os.path.exists(path):
-        return False
-
-    with open(path, "r", encoding="utf-8") as f:
-        lines = f.read().splitlines()
+        await DB.commit()
 
-    removed = False
-    new_lines = []
-    for line in lines:
-        if (not removed) and line.strip() == key_value:
-            removed = True
-            continue
-        new_lines.append(line)
+        cur = await DB.execute("SELECT total_changes()")
+        (after,) = await cur.fetchone()
 
-    if removed:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("\n".join(new_lines).rstrip() + ("\n" if new_lines else ""))
+    added = after - before
+    return added, len(keys) - added
 
-    return removed
+async def get_stock_count(program: str, duration: str) -> int:
+    cur = await DB.execute(
+        "SELECT COUNT(*) FROM keys WHERE program = ? AND duration = ? AND used_at IS NULL",
+        (program, duration),
+    )
+    (count,) = await cur.fetchone()
+    return int(count)
 
 async def pop_key(program: str, duration: str, reseller_id: int, buyer_id: int) -> Optional[str]:
     """
     Atomically claims one unused key and marks it used.
-    Then removes that key from the TXT.
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute("BEGIN IMMEDIATE")
-
-        cur = await db.execute(
-            "SELECT id, key FROM keys WHERE program = ? AND duration = ? AND used_at IS NULL LIMIT 1",
-            (program, duration),
+    async with DB_WRITE_LOCK:
+        cur = await DB.execute(
+            "UPDATE keys SET used_by = ?, used_for = ?, used_at = datetime('now') "
+            "WHERE id = (SELECT id FROM keys WHERE program = ? AND duration = ? AND used_at IS NULL LIMIT 1) "
+            "RETURNING key",
+            (reseller_id, buyer_id, program, duration),
         )
         row = await cur.fetchone()
-        if not row:
-            await db.execute("ROLLBACK")
-            return None
+        await DB.commit()
 
-        key_id, key_value = row
-
-        await db.execute(
-            "UPDATE keys SET used_by = ?, used_for = ?, used_at = datetime('now') WHERE id = ?",
-            (reseller_id, buyer_id, key_id),
-        )
-        await db.commit()
-
-    try:
-        ok = remove_key_from_txt(program, duration, key_value)
-        if not ok:
-            print(f"[WARN] Key not found in TXT for {program}_{duration}: {key_value}")
-    except Exception as e:
-        print(f"[WARN] Failed to remove key from TXT: {type(e).__name__}: {e}")
-
-    return key_value
+    return row[0] if row else None
 
 # -------------------------
 # Logging
 # -------------------------
+# Resolved once in on_ready; the fallback fetch is one REST call, not one
+# per generated key.
+LOG_CHANNEL: Optional[discord.abc.Messageable] = None
+
 async def get_log_channel() -> Optional[discord.abc.Messageable]:
-    ch = bot.get_channel(LOG_CHANNEL_ID)
-    if ch is not None:
-        return ch
+    global LOG_CHANNEL
+    if LOG_CHANNEL is not None:
+        return LOG_CHANNEL
+    LOG_CHANNEL = bot.get_channel(LOG_CHANNEL_ID)
+    if LOG_CHANNEL is not None:
+        return LOG_CHANNEL
     try:
-        return await bot.fetch_channel(LOG_CHANNEL_ID)
+        LOG_CHANNEL = await bot.fetch_channel(LOG_CHANNEL_ID)
     except Exception as e:
         print(f"[LOG] fetch_channel failed: {type(e).__name__}: {e}")
-        return None
+    return LOG_CHANNEL
 
 async def log_gen_key(
     program: str,
@@ -392,6 +395,34 @@ async def log_gen_key(
     except Exception as e:
         print(f"[LOG] send failed: {type(e).__name__}: {e}")
 
+# -------------------------
+# License DM embed
+# -------------------------
+@functools.lru_cache(maxsize=16)
+def _license_embed_template(program: str, duration: str) -> dict:
+    """
+    Everything about the buyer embed except the key is fixed per
+    (program, duration), so build it once and cache the dict form.
+    """
+    e = discord.Embed(
+        title="Your License Key",
+        description="Thanks for your purchase!",
+        color=THEME_COLOR,
+    )
+    e.add_field(name="Program", value=program.capitalize(), inline=True)
+    e.add_field(name="Duration", value=duration.capitalize(), inline=True)
+    e.set_footer(text="Keep this key private. Use the buttons below if you need help.")
+    e.set_image(url=BANNER_URL)
+    return e.to_dict()
+
+def license_embed(program: str, duration: str, key_value: str) -> discord.Embed:
+    data = _license_embed_template(program, duration)
+    # from_dict keeps the fields list by reference, so copy it before
+    # appending the per-key field or the cached template would grow.
+    embed = discord.Embed.from_dict({**data, "fields": [dict(f) for f in data.get("fields", [])]})
+    embed.add_field(name="Key", value=f"```{key_value}```", inline=False)
+    return embed
+
 # -------------------------
 # DM Buttons
 # -------------------------
@@ -419,18 +450,19 @@ class LicenseDMView(discord.ui.View):
 # -------------------------
 # Owner DM helper
 # -------------------------
+async def _dm_one_owner(owner_id: int, embed: discord.Embed):
+    user = bot.get_user(owner_id)
+    if user is None:
+        user = await bot.fetch_user(owner_id)
+    await user.send(embed=embed)
+
 async def dm_owners(embed: discord.Embed):
-    for owner_id in OWNER_IDS:
-        user = bot.get_user(owner_id)
-        if user is None:
-            try:
-                user = await bot.fetch_user(owner_id)
-            except Exception:
-                continue
-        try:
-            await user.send(embed=embed)
-        except Exception:
-            pass
+    # All owner DMs in parallel: latency is one REST round-trip, not one
+    # per owner. Failures for individual owners are ignored as before.
+    await asyncio.gather(
+        *(_dm_one_owner(owner_id, embed) for owner_id in OWNER_IDS),
+        return_exceptions=True,
+    )
 
 # -------------------------
 # Events
@@ -441,10 +473,11 @@ async def on_ready():
     print(f"[OWNER] OWNER_IDS={sorted(list(OWNER_IDS))}")
 
     await init_db()
+    await get_log_channel()
     try:
         synced = await bot.tree.sync()
         print(f"Logged in as {bot.user} | Synced {len(synced)} commands")
-        print(f"[PATHS] DATA_DIR={DATA_DIR} DB_PATH={DB_PATH} STOCK_DIR={STOCK_DIR}")
+        print(f"[PATHS] DATA_DIR={DATA_DIR} DB_PATH={DB_PATH}")
     except Exception as e:
         print("Sync error:", e)
 
@@ -453,14 +486,13 @@ async def on_ready():
 # -------------------------
 @bot.tree.command(name="add_reseller", description="Owner: allow a user to sell/generate keys for a program")
 @app_commands.describe(program="temp / perm / private", user="The reseller")
-@app_commands.choices(program=choiceify(PROGRAMS))
+@app_commands.choices(program=PROGRAM_CHOICES)
 async def add_reseller_cmd(interaction: discord.Interaction, program: app_commands.Choice[str], user: discord.Member):
     if not is_owner(interaction):
         return await interaction.response.send_message("Owner only.", ephemeral=True)
 
-    await add_reseller_db(user.id, program.value)
-
     if interaction.guild is None:
+        await add_reseller_db(user.id, program.value)
         return await interaction.response.send_message(
             "Added reseller in DB, but I can't assign roles in DMs.",
             ephemeral=True
@@ -468,18 +500,27 @@ async def add_reseller_cmd(interaction: discord.Interaction, program: app_comman
 
     role = discord.utils.get(interaction.guild.roles, name=RESELLER_ROLE_NAME)
     if role is None:
+        await add_reseller_db(user.id, program.value)
         return await interaction.response.send_message(
             f"Added reseller in DB, but I couldn't find a role named '{RESELLER_ROLE_NAME}'. Create it or rename it.",
             ephemeral=True
         )
 
-    role_note = ""
-    try:
-        await user.add_roles(role, reason="Added as reseller")
+    # The DB write and the role assignment are independent; overlap them so
+    # the command costs max(DB, Discord REST) instead of the sum.
+    db_result, role_result = await asyncio.gather(
+        add_reseller_db(user.id, program.value),
+        user.add_roles(role, reason="Added as reseller"),
+        return_exceptions=True,
+    )
+    if isinstance(db_result, BaseException):
+        raise db_result
+
+    if role_result is None:
         role_note = f" and gave **{role.name}** role"
-    except discord.Forbidden:
+    elif isinstance(role_result, discord.Forbidden):
         role_note = " (but I could not assign the role: check Manage Roles + role hierarchy)"
-    except Exception:
+    else:
         role_note = " (but I could not assign the role due to an error)"
 
     await interaction.response.send_message(
@@ -489,34 +530,47 @@ async def add_reseller_cmd(interaction: discord.Interaction, program: app_comman
 
 @bot.tree.command(name="remove_reseller", description="Owner: remove reseller access for a program")
 @app_commands.describe(program="temp / perm / private", user="The reseller")
-@app_commands.choices(program=choiceify(PROGRAMS))
+@app_commands.choices(program=PROGRAM_CHOICES)
 async def remove_reseller_cmd(interaction: discord.Interaction, program: app_commands.Choice[str], user: discord.Member):
     if not is_owner(interaction):
         return await interaction.response.send_message("Owner only.", ephemeral=True)
 
-    await remove_reseller_db(user.id, program.value)
-
-    still_reseller = await is_reseller_anywhere(user.id)
+    # What is_reseller_anywhere will answer once this program is removed,
+    # read from the cache up front so the role removal can run alongside
+    # the DB delete.
+    still_reseller = user.id in OWNER_IDS or any(
+        uid == user.id and prog != program.value for uid, prog in RESELLERS
+    )
 
     role_note = ""
+    role = None
     if interaction.guild is not None:
         role = discord.utils.get(interaction.guild.roles, name=RESELLER_ROLE_NAME)
         if role is None:
             role_note = f" (Role '{RESELLER_ROLE_NAME}' not found, so I couldn't remove it.)"
-        else:
-            if still_reseller:
-                role_note = " (They still have reseller access for another program, so I kept the role.)"
-            else:
-                try:
-                    await user.remove_roles(role, reason="Removed as reseller")
-                    role_note = f" and removed **{role.name}** role"
-                except discord.Forbidden:
-                    role_note = " (But I couldn't remove the role: check Manage Roles + role hierarchy.)"
-                except Exception:
-                    role_note = " (But I couldn't remove the role due to an error.)"
+        elif still_reseller:
+            role_note = " (They still have reseller access for another program, so I kept the role.)"
     else:
         role_note = " (No guild context; couldn't remove role.)"
 
+    if role is not None and not still_reseller:
+        db_result, role_result = await asyncio.gather(
+            remove_reseller_db(user.id, program.value),
+            user.remove_roles(role, reason="Removed as reseller"),
+            return_exceptions=True,
+        )
+        if isinstance(db_result, BaseException):
+            raise db_result
+
+        if role_result is None:
+            role_note = f" and removed **{role.name}** role"
+        elif isinstance(role_result, discord.Forbidden):
+            role_note = " (But I couldn't remove the role: check Manage Roles + role hierarchy.)"
+        else:
+            role_note = " (But I couldn't remove the role due to an error.)"
+    else:
+        await remove_reseller_db(user.id, program.value)
+
     await interaction.response.send_message(
         f"Removed {user.mention} from **{program.value}** resellers{role_note}.",
         ephemeral=True,
@@ -528,7 +582,7 @@ async def remove_reseller_cmd(interaction: discord.Interaction, program: app_com
     duration="day / week / month / lifetime",
     file="Upload a .txt with 1 key per line",
 )
-@app_commands.choices(program=choiceify(PROGRAMS), duration=choiceify(DURATIONS))
+@app_commands.choices(program=PROGRAM_CHOICES, duration=DURATION_CHOICES)
 async def add_stock_file_cmd(interaction: discord.Interaction, program: app_commands.Choice[str], duration: app_commands.Choice[str], file: discord.Attachment):
     if not is_owner(interaction):
         return await interaction.response.send_message("Owner only.", ephemeral=True)
@@ -537,9 +591,8 @@ async def add_stock_file_cmd(interaction: discord.Interaction, program: app_comm
         return await interaction.response.send_message("Upload a .txt file.", ephemeral=True)
 
     data = await file.read()
-    text = data.decode("utf-8", errors="ignore")
 
-    added, skipped = await add_stock_via_text(program.value, duration.value, text)
+    added, skipped = await add_stock(program.value, duration.value, parse_keys(data))
 
     await interaction.response.send_message(
         f"Added from file **{file.filename}** to **{program.value} {duration.value}**\n"
@@ -548,9 +601,9 @@ async def add_stock_file_cmd(interaction: discord.Interaction, program: app_comm
         ephemeral=True,
     )
 
-@bot.tree.command(name="clear_stock", description="Owner: clear ALL stock for a program + duration (wipes txt too)")
+@bot.tree.command(name="clear_stock", description="Owner: clear ALL unused stock for a program + duration")
 @app_commands.describe(program="temp / perm / private", duration="day / week / month / lifetime")
-@app_commands.choices(program=choiceify(PROGRAMS), duration=choiceify(DURATIONS))
+@app_commands.choices(program=PROGRAM_CHOICES, duration=DURATION_CHOICES)
 async def clear_stock_cmd(interaction: discord.Interaction, program: app_commands.Choice[str], duration: app_commands.Choice[str]):
     if not is_owner(interaction):
         return await interaction.response.send_message("Owner only.", ephemeral=True)
@@ -558,34 +611,58 @@ async def clear_stock_cmd(interaction: discord.Interaction, program: app_command
     prog = program.value
     dur = duration.value
 
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            "SELECT COUNT(*) FROM keys WHERE program = ? AND duration = ? AND used_at IS NULL",
-            (prog, dur),
-        )
-        (before_count,) = await cur.fetchone()
-
-        await db.execute(
+    async with DB_WRITE_LOCK:
+        await DB.execute(
             "DELETE FROM keys WHERE program = ? AND duration = ? AND used_at IS NULL",
             (prog, dur),
         )
-        await db.commit()
-
-    # wipe txt
-    path = stock_file(prog, dur)
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("")
+        # changes() reports the rows the DELETE removed, saving the
+        # up-front COUNT(*) scan over the same predicate.
+        cur = await DB.execute("SELECT changes()")
+        (removed,) = await cur.fetchone()
+        await DB.commit()
 
     await interaction.response.send_message(
         f"Cleared stock for **{prog} {dur}**.\n"
-        f"Removed **{int(before_count)}** unused keys from DB and wiped the txt.",
+        f"Removed **{int(removed)}** unused keys from DB.",
+        ephemeral=True,
+    )
+
+@bot.tree.command(name="export_stock", description="Owner: export unused stock as a .txt file")
+@app_commands.describe(program="temp / perm / private", duration="day / week / month / lifetime")
+@app_commands.choices(program=PROGRAM_CHOICES, duration=DURATION_CHOICES)
+async def export_stock_cmd(interaction: discord.Interaction, program: app_commands.Choice[str], duration: app_commands.Choice[str]):
+    if not is_owner(interaction):
+        return await interaction.response.send_message("Owner only.", ephemeral=True)
+
+    prog = program.value
+    dur = duration.value
+
+    buf = io.BytesIO()
+    async with DB.execute(
+        "SELECT key FROM keys WHERE program = ? AND duration = ? AND used_at IS NULL",
+        (prog, dur),
+    ) as cur:
+        async for (key_value,) in cur:
+            buf.write(key_value.encode("utf-8"))
+            buf.write(b"\n")
+
+    if buf.tell() == 0:
+        return await interaction.response.send_message(
+            f"No unused stock for **{prog} {dur}**.",
+            ephemeral=True,
+        )
+
+    buf.seek(0)
+    await interaction.response.send_message(
+        f"Unused stock for **{prog} {dur}**:",
+        file=discord.File(buf, filename=f"{prog}_{dur}.txt"),
         ephemeral=True,
     )
 
 @bot.tree.command(name="stock", description="Check unused stock count for a program/duration")
 @app_commands.describe(program="temp / perm / private", duration="day / week / month / lifetime")
-@app_commands.choices(program=choiceify(PROGRAMS), duration=choiceify(DURATIONS))
+@app_commands.choices(program=PROGRAM_CHOICES, duration=DURATION_CHOICES)
 async def stock_cmd(interaction: discord.Interaction, program: app_commands.Choice[str], duration: app_commands.Choice[str]):
     if not await reseller_has_access(interaction.user.id, program.value):
         return await interaction.response.send_message("You don’t have access to that program.", ephemeral=True)
@@ -598,7 +675,7 @@ async def stock_cmd(interaction: discord.Interaction, program: app_commands.Choi
 
 @bot.tree.command(name="hwid_reset", description="Request a HWID reset (DMs the owner)")
 @app_commands.describe(key="Customer key", duration="day / week / month / lifetime", reason="Reason for reset")
-@app_commands.choices(duration=choiceify(DURATIONS))
+@app_commands.choices(duration=DURATION_CHOICES)
 async def hwid_reset_cmd(interaction: discord.Interaction, key: str, duration: app_commands.Choice[str], reason: str):
     if not await is_reseller_anywhere(interaction.user.id):
         return await interaction.response.send_message("You don’t have permission to use this.", ephemeral=True)
@@ -615,7 +692,7 @@ async def hwid_reset_cmd(interaction: discord.Interaction, key: str, duration: a
 
 @bot.tree.command(name="gen_key", description="Generate 1 key for a buyer (pulls from stock)")
 @app_commands.describe(program="temp / perm / private", duration="day / week / month / lifetime", buyer="Who bought the key")
-@app_commands.choices(program=choiceify(PROGRAMS), duration=choiceify(DURATIONS))
+@app_commands.choices(program=PROGRAM_CHOICES, duration=DURATION_CHOICES)
 async def gen_key_cmd(interaction: discord.Interaction, program: app_commands.Choice[str], duration: app_commands.Choice[str], buyer: discord.Member):
     if not await reseller_has_access(interaction.user.id, program.value):
         return await interaction.response.send_message("You don’t have access to that program.", ephemeral=True)
@@ -639,17 +716,7 @@ async def gen_key_cmd(interaction: discord.Interaction, program: app_commands.Ch
     dm_error = None
 
     try:
-        embed = discord.Embed(
-            title="Your License Key",
-            description="Thanks for your purchase!",
-            color=THEME_COLOR,
-        )
-        embed.add_field(name="Program", value=program.value.capitalize(), inline=True)
-        embed.add_field(name="Duration", value=duration.value.capitalize(), inline=True)
-        embed.add_field(name="Key", value=f"```{key_value}```", inline=False)
-        embed.set_footer(text="Keep this key private. Use the buttons below if you need help.")
-        embed.set_image(url=BANNER_URL)
-
+        embed = license_embed(program.value, duration.value, key_value)
         view = LicenseDMView(key_value)
 
         # "Confirmed" if no exception